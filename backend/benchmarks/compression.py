@@ -0,0 +1,59 @@
+"""Compare response bytes and CPU per request for /schedule-sized payloads.
+
+Run from backend/: python -m benchmarks.compression
+"""
+import json
+import time
+
+from src.compression import SUPPORTED_ENCODINGS, CompressedPayload, compress
+
+REQUESTS = 2000
+
+
+def make_schedule(days: int = 6, pairs: int = 4) -> list[dict]:
+    disciplines = ["Вища математика", "Програмування", "Бази даних", "Фізика", "Англійська мова"]
+    teachers = ["Іваненко І.І.", "Петренко П.П.", "Сидоренко С.С."]
+    items = []
+    for day in range(days):
+        for pair in range(pairs):
+            items.append({
+                "study_time": f"0{8 + pair}:00-0{9 + pair}:20",
+                "study_time_begin": f"0{8 + pair}:00",
+                "study_time_end": f"0{9 + pair}:20",
+                "week_day": f"День {day}",
+                "full_date": f"{20 + day}.10.2025",
+                "discipline": disciplines[(day + pair) % len(disciplines)],
+                "study_type": "Лекція" if pair % 2 else "Практичне заняття",
+                "cabinet": f"{100 + pair}",
+                "employee_short": teachers[pair % len(teachers)],
+                "study_group": "КН-21",
+                "study_subgroup": None,
+                "subgroup": None,
+            })
+    return items
+
+
+def measure(label: str, fn) -> None:
+    start = time.process_time()
+    for _ in range(REQUESTS):
+        body = fn()
+    cpu_us = (time.process_time() - start) / REQUESTS * 1e6
+    print(f"{label:<24}{len(body):>10}{cpu_us:>14.1f}")
+
+
+def main() -> None:
+    items = make_schedule()
+    payload = CompressedPayload(items)
+
+    def serialize() -> bytes:
+        return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    print(f"{'mode':<24}{'bytes':>10}{'cpu us/req':>14}")
+    measure("identity", serialize)
+    for encoding in SUPPORTED_ENCODINGS:
+        measure(f"{encoding} per request", lambda: compress(serialize(), encoding))
+        measure(f"{encoding} precompressed", lambda: payload.bodies[encoding])
+
+
+if __name__ == "__main__":
+    main()
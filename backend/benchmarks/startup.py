@@ -0,0 +1,112 @@
+"""Measure cold start: import time of the app and time to the first successful requests.
+
+Times, from process spawn, the first 200 from /groups (database) and the first
+answer to an authenticated /get_hidden_subjects (Telegram auth + database).
+
+Run from backend/ with DATABASE_URL (a migrated database) and TOKEN set:
+python -m benchmarks.startup. The authenticated request creates the benchmark
+user (BENCH_TELEGRAM_ID, default 1) if it does not exist.
+"""
+import hashlib
+import hmac
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+RUNS = 5
+READY_TIMEOUT = 30.0
+BENCH_TELEGRAM_ID = int(os.getenv("BENCH_TELEGRAM_ID", "1"))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "import src.main; src.main.create_app(); "
+    "print(time.perf_counter() - t)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_time() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        check=True, capture_output=True, text=True, env=os.environ,
+    )
+    return float(out.stdout.strip())
+
+
+def signed_init_data(token: str, user_id: int) -> str:
+    """Telegram Mini App init data for `user_id`, signed the way Telegram signs it"""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": "benchmark",
+        "user": json.dumps({"id": user_id, "first_name": "Bench", "username": "bench"}),
+    }
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.digest(b"WebAppData", token.encode(), hashlib.sha256)
+    fields["hash"] = hmac.new(secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(fields)
+
+
+def wait_for(url: str, start: float, ok_statuses: tuple[int, ...], headers: dict | None = None) -> float:
+    request = urllib.request.Request(url, headers=headers or {})
+    while time.perf_counter() - start < READY_TIMEOUT:
+        try:
+            with urllib.request.urlopen(request, timeout=5) as resp:
+                status = resp.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.01)
+            continue
+        if status in ok_statuses:
+            return time.perf_counter() - start
+        raise RuntimeError(f"{url} answered {status}")
+    raise TimeoutError(f"{url} did not succeed in time")
+
+
+def time_to_first_request() -> tuple[float, float]:
+    """Seconds from process spawn to the first successful DB-backed and authenticated requests"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    auth = {"Authorization": "Bearer " + signed_init_data(os.environ["TOKEN"], BENCH_TELEGRAM_ID)}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:create_app", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        groups = wait_for(f"{base}/groups", start, (200,))
+        # 428 means the user has no group yet: auth and the DB lookup still ran
+        authenticated = wait_for(f"{base}/get_hidden_subjects", start, (200, 428), auth)
+        return groups, authenticated
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def report(label: str, samples: list[float]) -> None:
+    ms = [s * 1000 for s in samples]
+    print(f"{label:<28}median {statistics.median(ms):8.1f} ms   min {min(ms):8.1f} ms")
+
+
+def main() -> None:
+    report("import + create_app", [import_time() for _ in range(RUNS)])
+    groups, authenticated = zip(*(time_to_first_request() for _ in range(RUNS)))
+    report("first /groups (DB)", groups)
+    report("first authenticated request", authenticated)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,41 @@
+from __future__ import annotations
+
 import http
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from fastapi import Depends, HTTPException
 from fastapi.security.http import HTTPAuthorizationCredentials, HTTPBase
 
-from telegram_webapp_auth.auth import TelegramAuthenticator, WebAppUser, generate_secret_key
-from telegram_webapp_auth.errors import InvalidInitDataError
-
 from src.config import settings
 
+if TYPE_CHECKING:
+    from telegram_webapp_auth.auth import TelegramAuthenticator, WebAppUser
+
 telegram_authentication_schema = HTTPBase(scheme="bearer")
 
 
+@lru_cache(maxsize=1)
 def get_telegram_authenticator() -> TelegramAuthenticator:
+    from telegram_webapp_auth.auth import TelegramAuthenticator, generate_secret_key
+
     secret_key = generate_secret_key(settings.token)
     return TelegramAuthenticator(secret_key)
 
 
+def warm_up_authenticator() -> None:
+    """Import the auth package and build the authenticator before the first request needs them"""
+    import telegram_webapp_auth.errors  # noqa: F401
+
+    get_telegram_authenticator()
+
+
 def get_current_user(
     auth_cred: HTTPAuthorizationCredentials = Depends(telegram_authentication_schema),
     telegram_authenticator: TelegramAuthenticator = Depends(get_telegram_authenticator),
 ) -> WebAppUser:
+    from telegram_webapp_auth.errors import InvalidInitDataError
+
     try:
         init_data = telegram_authenticator.validate(auth_cred.credentials)
     except InvalidInitDataError:
@@ -7,5 +7,15 @@ class Settings:
     api_url: str = "https://vnz.osvita.net/WidgetSchedule.asmx/GetScheduleDataX"
     token: str = os.getenv("TOKEN")
     database_url: str = os.getenv("DATABASE_URL")
+    snapshot_dir: str = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+    search_backend: str = os.getenv("SEARCH_BACKEND", "memory")
+    warmup_db_connections: int = int(os.getenv("WARMUP_DB_CONNECTIONS", "2"))
+    warmup_timeout: float = float(os.getenv("WARMUP_TIMEOUT", "5"))
+    debug_query_stats: bool = os.getenv("DEBUG_QUERY_STATS", "").lower() in ("1", "true", "yes")
+    rate_limit_redis_url: str | None = os.getenv("RATE_LIMIT_REDIS_URL")
+    user_rate_limit: float = float(os.getenv("USER_RATE_LIMIT", "1"))
+    user_rate_burst: float = float(os.getenv("USER_RATE_BURST", "20"))
+    upstream_rate_limit: float = float(os.getenv("UPSTREAM_RATE_LIMIT", "5"))
+    upstream_rate_burst: float = float(os.getenv("UPSTREAM_RATE_BURST", "20"))
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
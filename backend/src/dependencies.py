@@ -1,23 +1,37 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from telegram_webapp_auth.auth import WebAppUser
+from sqlalchemy.orm import joinedload, selectinload
 
 from src.auth import get_current_user
 from src.database import get_session
 from src.models import User, UserHiddenSubject
+from src.ratelimit import user_rate_limiter
 
+if TYPE_CHECKING:
+    from telegram_webapp_auth.auth import WebAppUser
 
-async def get_or_create_user(
+
+async def get_rate_limited_user(
     web_app_user: WebAppUser = Depends(get_current_user),
+) -> WebAppUser:
+    await user_rate_limiter.check(web_app_user.id)
+    return web_app_user
+
+
+async def get_or_create_user(
+    web_app_user: WebAppUser = Depends(get_rate_limited_user),
     session: AsyncSession = Depends(get_session)
 ) -> User:
     result = await session.execute(
         select(User)
         .where(User.telegram_id == web_app_user.id)
         .options(
-            selectinload(User.group),
+            joinedload(User.group),
             selectinload(User.hidden_subjects).selectinload(UserHiddenSubject.subject)
         )
     )
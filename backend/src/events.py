@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+from src.compression import dump_json
+from src.snapshots import Snapshot
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_INTERVAL = 15.0
+# Encoded events kept per channel; a snapshot transition needs one entry per distinct hidden set
+EVENT_CACHE_SIZE = 64
+
+
+def subject_key(item: dict) -> tuple:
+    return (
+        item.get("discipline", ""),
+        item.get("employee_short", ""),
+        item.get("study_type", ""),
+        item.get("subgroup"),
+    )
+
+
+def filter_schedule(items: list[dict], hidden_subjects: set[tuple]) -> list[dict]:
+    """Drop items whose subject the user has hidden"""
+    if not hidden_subjects:
+        return items
+    return [item for item in items if subject_key(item) not in hidden_subjects]
+
+
+def diff_schedule(old: list[dict], new: list[dict]) -> dict | None:
+    """Multiset difference of two schedules, or None when they are equal"""
+    if old is new:
+        return None
+    old_keys = Counter(json.dumps(item, sort_keys=True) for item in old)
+    new_keys = Counter(json.dumps(item, sort_keys=True) for item in new)
+    removed = old_keys - new_keys
+    added = new_keys - old_keys
+    if not removed and not added:
+        return None
+    return {
+        "added": [json.loads(key) for key in added.elements()],
+        "removed": [json.loads(key) for key in removed.elements()],
+    }
+
+
+def format_event(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dump_json(data) + b"\n\n"
+
+
+class _Subscriber:
+    __slots__ = ("user_id", "hidden", "wakeup")
+
+    def __init__(self, user_id: int, hidden: frozenset[tuple]):
+        self.user_id = user_id
+        self.hidden = hidden
+        self.wakeup = asyncio.Event()
+
+
+class _Channel:
+    __slots__ = ("snapshot", "subscribers", "poller", "events")
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        self.subscribers: set[_Subscriber] = set()
+        self.poller: asyncio.Task | None = None
+        # (sent digest, sent hidden, new digest, new hidden) -> encoded event or None
+        self.events: OrderedDict[tuple, bytes | None] = OrderedDict()
+
+    def event(
+        self,
+        sent: Snapshot | None,
+        sent_hidden: frozenset[tuple],
+        current: Snapshot,
+        hidden: frozenset[tuple],
+    ) -> bytes | None:
+        """Encoded event taking a subscriber from what it was sent to `current`.
+
+        Computed once per transition and shared by every subscriber making the
+        same one, so a publish costs one diff for all users without hidden
+        subjects rather than one per connection.
+        """
+        key = (sent.digest if sent else None, sent_hidden, current.digest, hidden)
+        try:
+            self.events.move_to_end(key)
+            return self.events[key]
+        except KeyError:
+            pass
+
+        items = filter_schedule(current.content(), hidden)
+        if sent is None:
+            event = format_event("schedule", items)
+        else:
+            delta = diff_schedule(filter_schedule(sent.content(), sent_hidden), items)
+            event = None if delta is None else format_event("delta", delta)
+
+        self.events[key] = event
+        while len(self.events) > EVENT_CACHE_SIZE:
+            self.events.popitem(last=False)
+        return event
+
+
+class ScheduleBroadcaster:
+    """Fan out schedule changes to SSE subscribers, multiplexed per group week.
+
+    A connection holds only an Event, its hidden-subject set and a reference to
+    the last snapshot it sent; schedule content and encoded events are shared
+    through the immutable snapshots and the channel's event cache. Each channel refreshes its group once per interval,
+    however many clients are connected.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._channels: dict[Hashable, _Channel] = {}
+        self._by_user: defaultdict[int, set[_Subscriber]] = defaultdict(set)
+
+    def publish(self, key: Hashable, snapshot: Snapshot) -> None:
+        channel = self._channels.get(key)
+        if channel is None or channel.snapshot.digest == snapshot.digest:
+            return
+        channel.snapshot = snapshot
+        for subscriber in channel.subscribers:
+            subscriber.wakeup.set()
+
+    def update_hidden(self, user_id: int, hidden: set[tuple]) -> None:
+        hidden = frozenset(hidden)
+        for subscriber in self._by_user.get(user_id, ()):
+            subscriber.hidden = hidden
+            subscriber.wakeup.set()
+
+    async def stream(
+        self,
+        key: Hashable,
+        user_id: int,
+        hidden: set[tuple],
+        snapshot: Snapshot,
+        refresh: Callable[[], Awaitable[Any]],
+    ) -> AsyncIterator[bytes]:
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(snapshot)
+            channel.poller = asyncio.create_task(self._poll(refresh))
+        # Otherwise the channel already holds the newest snapshot: every write is
+        # published, while `snapshot` may have been read before a newer one landed
+
+        subscriber = _Subscriber(user_id, frozenset(hidden))
+        channel.subscribers.add(subscriber)
+        self._by_user[user_id].add(subscriber)
+        try:
+            sent, sent_hidden = channel.snapshot, subscriber.hidden
+            yield channel.event(None, sent_hidden, sent, sent_hidden)
+
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                subscriber.wakeup.clear()
+
+                current, hidden = channel.snapshot, subscriber.hidden
+                event = channel.event(sent, sent_hidden, current, hidden)
+                sent, sent_hidden = current, hidden
+                if event is not None:
+                    yield event
+        finally:
+            self._unsubscribe(key, channel, subscriber)
+
+    def _unsubscribe(self, key: Hashable, channel: _Channel, subscriber: _Subscriber) -> None:
+        channel.subscribers.discard(subscriber)
+        user_subscribers = self._by_user.get(subscriber.user_id)
+        if user_subscribers is not None:
+            user_subscribers.discard(subscriber)
+            if not user_subscribers:
+                del self._by_user[subscriber.user_id]
+        if not channel.subscribers:
+            if channel.poller is not None:
+                channel.poller.cancel()
+            if self._channels.get(key) is channel:
+                del self._channels[key]
+
+    async def _poll(self, refresh: Callable[[], Awaitable[Any]]) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Schedule refresh for stream failed: %r", exc)
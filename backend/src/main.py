@@ -1,44 +1,134 @@
+from __future__ import annotations
+
+import asyncio
 import json
-from datetime import date, timedelta
+import logging
+from datetime import date, datetime, timedelta
 from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Literal
 
-import httpx
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from telegram_webapp_auth.auth import WebAppUser
 
-from src.dependencies import get_or_create_user
-from src.database import get_session
+from src.auth import warm_up_authenticator
+from src.dependencies import get_or_create_user, get_rate_limited_user
+from src.database import dispose_engine, get_session, get_sessionmaker, warm_up_pool
 from src.models import Subject, User, UserHiddenSubject, Group
-from src.auth import get_current_user
+from src.compression import CompressedPayload, CompressionMiddleware, ResponseCache
+from src.events import ScheduleBroadcaster, filter_schedule
+from src.instrumentation import QueryStatsMiddleware
+from src.ratelimit import get_rate_limit_store, upstream_rate_limiter, user_rate_limiter
+from src.search import SearchIndex, load_subject_names, search_pg_trgm
+from src.snapshots import Snapshot, SnapshotStore
 
 from src.config import settings
 
+if TYPE_CHECKING:
+    import httpx
+    from telegram_webapp_auth.auth import WebAppUser
+
+logger = logging.getLogger(__name__)
+
+GROUPS_CACHE_KEY = "groups"
+SCHEDULE_CACHE_TTL = 300
+MAX_SCHEDULE_RANGE_DAYS = 31
+GROUPS_CACHE_TTL = 3600
+
+snapshot_store = SnapshotStore(settings.snapshot_dir, ttl=SCHEDULE_CACHE_TTL)
+groups_cache = ResponseCache(maxsize=1, ttl=GROUPS_CACHE_TTL)
+search_index = SearchIndex()
+schedule_broadcaster = ScheduleBroadcaster(refresh_interval=SCHEDULE_CACHE_TTL)
+# (site_id, start, end) -> in-flight upstream fetch for that week
+week_fetches: dict[tuple, asyncio.Task] = {}
+
+router = APIRouter()
+
+
+async def warm_up_upstream(client: httpx.AsyncClient) -> None:
+    """Open a keepalive connection to the upstream API (DNS + TLS) ahead of the first request"""
+    await client.head(settings.api_url)
+
+
+async def warm_up_search_index() -> None:
+    async with get_sessionmaker()() as session:
+        await load_groups(session)
+        await load_subject_names(search_index, session)
+
+
+async def prune_snapshots() -> None:
+    while True:
+        await asyncio.sleep(SCHEDULE_CACHE_TTL)
+        try:
+            await asyncio.to_thread(snapshot_store.prune)
+        except Exception as exc:
+            logger.warning("Pruning snapshots failed: %r", exc)
+
+
+async def warm_up(app: FastAPI) -> None:
+    try:
+        warm_up_authenticator()
+    except Exception as exc:
+        logger.warning("Warm-up of authenticator failed: %r", exc)
+
+    tasks = {
+        "database pool": warm_up_pool(settings.warmup_db_connections),
+        "upstream connection": warm_up_upstream(app.state.http_client),
+    }
+    if settings.search_backend == "memory":
+        tasks["search index"] = warm_up_search_index()
+    results = await asyncio.gather(
+        *(asyncio.wait_for(task, settings.warmup_timeout) for task in tasks.values()),
+        return_exceptions=True,
+    )
+    for name, result in zip(tasks, results):
+        if isinstance(result, BaseException):
+            logger.warning("Warm-up of %s failed: %r", name, result)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    import httpx
+
     app.state.http_client = httpx.AsyncClient(
         timeout=30.0,
         limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
     )
+    await warm_up(app)
+    pruner = asyncio.create_task(prune_snapshots())
     
     yield
     
+    pruner.cancel()
     await app.state.http_client.aclose()
+    await dispose_engine()
 
-app = FastAPI(lifespan=lifespan, root_path="/api")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan, root_path="/api")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(CompressionMiddleware)
+    # Build the limiter stores now so a missing redis package fails at boot, not on the first request
+    for limiter in (user_rate_limiter, upstream_rate_limiter):
+        get_rate_limit_store(limiter.name)
+    if settings.debug_query_stats:
+        app.add_middleware(QueryStatsMiddleware)
+    app.include_router(router)
+
+    return app
 
 def format_subject_response(subject: Subject) -> dict:
     """Format subject for API response"""
@@ -50,13 +140,22 @@ def format_subject_response(subject: Subject) -> dict:
         "subgroup": subject.subgroup,
     }
 
-@app.get("/schedule")
-async def get_schedule(
-    request: Request,
-    aStartDate: str | None = None,
-    aEndDate: str | None = None,
-    user: WebAppUser = Depends(get_or_create_user)
-):
+def format_group_response(group: Group) -> dict:
+    """Format group for API response"""
+    return {
+        "id": group.id,
+        "site_id": group.site_id,
+        "name": group.name,
+        "faculty": group.faculty,
+        "semester": group.semester,
+    }
+
+@router.get("/health")
+async def health():
+    return {"status": "ok"}
+
+def get_week_dates(aStartDate: str | None, aEndDate: str | None) -> tuple[date, date]:
+    """Parse the requested dates, defaulting to today through the coming Saturday"""
     today = date.today()
 
     days_until_saturday = (5 - today.weekday()) % 7
@@ -69,19 +168,140 @@ async def get_schedule(
     if not aEndDate:
         aEndDate = end_week.strftime("%d.%m.%Y")
 
+    try:
+        start_date = datetime.strptime(aStartDate, "%d.%m.%Y").date()
+        end_date = datetime.strptime(aEndDate, "%d.%m.%Y").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in DD.MM.YYYY format")
+
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="aEndDate must not be before aStartDate")
+    if (end_date - start_date).days > MAX_SCHEDULE_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range must not exceed {MAX_SCHEDULE_RANGE_DAYS} days",
+        )
+
+    return start_date, end_date
+
+
+def get_hidden_subjects_set(user: User) -> set[tuple]:
+    return {
+        (hs.subject.name, hs.subject.teacher, hs.subject.study_type, hs.subject.subgroup)
+        for hs in user.hidden_subjects
+    }
+
+
+async def get_week_snapshot(
+    client: httpx.AsyncClient, site_id: str, start_date: date, end_date: date
+) -> Snapshot | dict:
+    """Return the group's week from the snapshot store, fetching it from upstream when stale.
+
+    Concurrent misses for the same week share one upstream fetch (and one
+    rate-limit token) instead of each fetching on their own.
+    """
+    snapshot = snapshot_store.get(site_id, start_date, end_date)
+    if snapshot is not None:
+        return snapshot
+
+    key = (site_id, start_date, end_date)
+    task = week_fetches.get(key)
+    if task is None:
+        task = asyncio.create_task(refresh_week_snapshot(client, site_id, start_date, end_date))
+        week_fetches[key] = task
+        task.add_done_callback(lambda t: _finish_week_fetch(key, t))
+    # Shielded so one waiter disconnecting does not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+
+def _finish_week_fetch(key: tuple, task: asyncio.Task) -> None:
+    if week_fetches.get(key) is task:
+        del week_fetches[key]
+    if not task.cancelled():
+        task.exception()  # retrieved here in case every waiter went away
+
+
+async def refresh_week_snapshot(
+    client: httpx.AsyncClient, site_id: str, start_date: date, end_date: date
+) -> Snapshot | dict:
+    await upstream_rate_limiter.check("global")
+    items = await fetch_schedule(
+        client, site_id, start_date.strftime("%d.%m.%Y"), end_date.strftime("%d.%m.%Y")
+    )
+    if isinstance(items, dict):
+        return items
+    search_index.add_schedule(items)
+    snapshot = await asyncio.to_thread(snapshot_store.put, site_id, start_date, end_date, items)
+    schedule_broadcaster.publish((site_id, start_date, end_date), snapshot)
+    return snapshot
+
+
+@router.get("/schedule")
+async def get_schedule(
+    request: Request,
+    aStartDate: str | None = None,
+    aEndDate: str | None = None,
+    user: User = Depends(get_or_create_user)
+):
+    start_date, end_date = get_week_dates(aStartDate, aEndDate)
+
     if not user.group_id:
         raise HTTPException(status_code=400, detail="User has no group assigned")
     
     group = user.group
-    
-    hidden_subjects_set = {
-        (hs.subject.name, hs.subject.teacher, hs.subject.study_type, hs.subject.subgroup)
-        for hs in user.hidden_subjects
-    }
 
+    snapshot = await get_week_snapshot(request.app.state.http_client, group.site_id, start_date, end_date)
+    if isinstance(snapshot, dict):
+        return snapshot
+
+    if not user.hidden_subjects:
+        return snapshot.response(request)
+
+    return filter_schedule(snapshot.content(), get_hidden_subjects_set(user))
+
+
+@router.get("/schedule/stream")
+async def stream_schedule(
+    request: Request,
+    aStartDate: str | None = None,
+    aEndDate: str | None = None,
+    user: User = Depends(get_or_create_user),
+    session: AsyncSession = Depends(get_session),
+):
+    start_date, end_date = get_week_dates(aStartDate, aEndDate)
+
+    if not user.group_id:
+        raise HTTPException(status_code=400, detail="User has no group assigned")
+
+    site_id = user.group.site_id
+    hidden_subjects_set = get_hidden_subjects_set(user)
+    # Return the connection to the pool; the stream may stay open for hours
+    await session.close()
+
+    client = request.app.state.http_client
+    snapshot = await get_week_snapshot(client, site_id, start_date, end_date)
+    if isinstance(snapshot, dict):
+        return snapshot
+
+    events = schedule_broadcaster.stream(
+        (site_id, start_date, end_date),
+        user.id,
+        hidden_subjects_set,
+        snapshot,
+        refresh=lambda: get_week_snapshot(client, site_id, start_date, end_date),
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def fetch_schedule(client: httpx.AsyncClient, site_id: str, aStartDate: str, aEndDate: str) -> list | dict:
+    """Fetch a group's schedule from the upstream API, without per-user filtering"""
     params = {
         "aVuzID": 11613,
-        "aStudyGroupID": f'"{group.site_id}"',
+        "aStudyGroupID": f'"{site_id}"',
         "aStartDate": f'"{aStartDate}"',
         "aEndDate": f'"{aEndDate}"',
         "aStudyTypeID": None
@@ -97,7 +317,7 @@ async def get_schedule(
         "Upgrade-Insecure-Requests": "1",
     }
 
-    resp = await request.app.state.http_client.get(settings.api_url, params=params, headers=headers)
+    resp = await client.get(settings.api_url, params=params, headers=headers)
     text = resp.text
 
     try:
@@ -106,19 +326,7 @@ async def get_schedule(
         return {"error": "Cannot parse JSON from API", "raw": text}
 
     exclude = {"__type", "employee"}
-    filtered = []
-    
-    for item in data["d"]:
-        discipline = item.get("discipline", "")
-        employee_short = item.get("employee_short", "")
-        study_type = item.get("study_type", "")
-        subgroup = item.get("subgroup")
-        
-        if (discipline, employee_short, study_type, subgroup) not in hidden_subjects_set:
-            filtered_item = {k: v for k, v in item.items() if k not in exclude}
-            filtered.append(filtered_item)
-
-    return filtered
+    return [{k: v for k, v in item.items() if k not in exclude} for item in data["d"]]
 
 
 class SubjectRequest(BaseModel):
@@ -128,7 +336,7 @@ class SubjectRequest(BaseModel):
     subgroup: str | None = None
     
 
-@app.post("/hide_subject")
+@router.post("/hide_subject")
 async def hide_subject(
     request: SubjectRequest,
     user: User = Depends(get_or_create_user),
@@ -164,22 +372,19 @@ async def hide_subject(
             group_id=user.group.id
         )
         session.add(subject)
-        await session.commit()
-        await session.refresh(subject)
 
-    hidden = UserHiddenSubject(user_id=user.id, subject_id=subject.id)
-    session.add(hidden)
+    user.hidden_subjects.append(UserHiddenSubject(user_id=user.id, subject=subject))
     await session.commit()
-    await session.refresh(hidden)
+    schedule_broadcaster.update_hidden(user.id, get_hidden_subjects_set(user))
 
     return {"message": f"Subject '{request.name}' hidden for user {user.username}"}
 
 
-@app.get("/get_hidden_subjects")
+@router.get("/get_hidden_subjects")
 async def get_hidden_subjects(user: User = Depends(get_or_create_user)):
     return [format_subject_response(hs.subject) for hs in user.hidden_subjects]
 
-@app.post("/unhide_subject")
+@router.post("/unhide_subject")
 async def unhide_subject(
     request: SubjectRequest,
     user: User = Depends(get_or_create_user),
@@ -199,42 +404,63 @@ async def unhide_subject(
     if not hidden_subject:
         raise HTTPException(status_code=400, detail="Subject is not hidden")
 
-    await session.delete(hidden_subject)
+    user.hidden_subjects.remove(hidden_subject)
     await session.commit()
+    schedule_broadcaster.update_hidden(user.id, get_hidden_subjects_set(user))
 
     return {"message": f"Subject '{request.name}' restored for user {user.username}"}
 
-@app.get("/groups")
-async def get_groups(session: AsyncSession = Depends(get_session)):
-    result = await session.execute(select(Group))
-    groups = result.scalars().all()
+async def load_groups(session: AsyncSession) -> CompressedPayload:
+    """Return the cached groups list, reloading it and the search index when stale"""
+    payload = groups_cache.get(GROUPS_CACHE_KEY)
+    if payload is None:
+        result = await session.execute(select(Group))
+        groups = result.scalars().all()
+        search_index.sync_groups(groups)
+        payload = groups_cache.set(GROUPS_CACHE_KEY, [format_group_response(g) for g in groups])
+    return payload
+
+@router.get("/groups")
+async def get_groups(request: Request, session: AsyncSession = Depends(get_session)):
+    payload = await load_groups(session)
+    return payload.response(request, max_age=GROUPS_CACHE_TTL)
+
+@router.get("/search")
+async def search(
+    q: str = Query(min_length=1, max_length=100),
+    kind: Literal["group", "discipline", "teacher"] | None = None,
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    web_app_user: WebAppUser = Depends(get_rate_limited_user),
+):
+    if settings.search_backend == "pg_trgm":
+        return await search_pg_trgm(session, q, limit, kind)
 
-    return groups
+    await load_groups(session)
+    return search_index.search(q, limit, kind)
 
 class SetGroupRequest(BaseModel):
     group_id: str
 
-@app.post("/set-group")
+@router.post("/set-group")
 async def set_user_group(
     data: SetGroupRequest,
     session: AsyncSession = Depends(get_session),
-    web_app_user: WebAppUser = Depends(get_current_user)
+    web_app_user: WebAppUser = Depends(get_rate_limited_user)
 ):
-    result = await session.execute(
-        select(User).where(User.telegram_id == web_app_user.id)
+    group_id = await session.scalar(
+        select(Group.id).where(Group.site_id == data.group_id)
     )
-    user = result.scalar_one_or_none()
+    if group_id is None:
+        raise HTTPException(status_code=404, detail="Group not found")
 
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    group_result = await session.execute(
-        select(Group).where(Group.site_id == data.group_id)
+    result = await session.execute(
+        update(User)
+        .where(User.telegram_id == web_app_user.id)
+        .values(group_id=group_id)
     )
-    group = group_result.scalar_one_or_none()
-    if not group:
-        raise HTTPException(status_code=404, detail="Group not found")
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    user.group_id = group.id
     await session.commit()
     return {"detail": "Group set successfully"}
\ No newline at end of file
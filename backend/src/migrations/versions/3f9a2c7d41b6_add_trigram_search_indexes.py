@@ -0,0 +1,44 @@
+"""add trigram search indexes
+
+Revision ID: 3f9a2c7d41b6
+Revises: 8c6f5503287a
+Create Date: 2026-10-19 10:12:43.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a2c7d41b6'
+down_revision: Union[str, Sequence[str], None] = '8c6f5503287a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = (
+    ('ix_groups_name_trgm', 'groups', 'name'),
+    ('ix_groups_faculty_trgm', 'groups', 'faculty'),
+    ('ix_subjects_name_trgm', 'subjects', 'name'),
+    ('ix_subjects_teacher_trgm', 'subjects', 'teacher'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in TRIGRAM_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,142 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+
+from src.config import settings
+
+
+class RateLimitStore(ABC):
+    """Backend holding token-bucket state; shared stores let several workers enforce one budget"""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens from the bucket. Returns 0 if allowed, otherwise seconds to wait"""
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets in an LRU; idle buckets are evicted once they would be full again"""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens, updated_at, _ = bucket
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        self._evict(now)
+        return retry_after
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while len(buckets) > self.max_entries:
+            buckets.popitem(last=False)
+        while buckets:
+            key, (_, _, full_at) = next(iter(buckets.items()))
+            if full_at > now:
+                break
+            del buckets[key]
+
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Buckets shared by all workers, updated atomically by a Lua script"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        from redis.asyncio import Redis
+
+        self.prefix = prefix
+        self._redis = Redis.from_url(url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        result = await self._script(keys=[self.prefix + key], args=[rate, capacity, cost])
+        return float(result)
+
+
+@lru_cache(maxsize=None)
+def get_rate_limit_store(name: str) -> RateLimitStore:
+    if settings.rate_limit_redis_url:
+        return RedisRateLimitStore(settings.rate_limit_redis_url, prefix=f"ratelimit:{name}:")
+    return MemoryRateLimitStore()
+
+
+class RateLimiter:
+    """Token-bucket limiter; a rate or capacity of 0 disables it"""
+
+    def __init__(self, name: str, rate: float, capacity: float):
+        if rate < 0 or capacity < 0:
+            raise ValueError(f"Rate limit {name!r} must not be negative")
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.capacity > 0
+
+    async def check(self, key: str | int, cost: float = 1.0) -> None:
+        """Raise 429 with Retry-After when the bucket for `key` is empty"""
+        if not self.enabled:
+            return
+        store = get_rate_limit_store(self.name)
+        retry_after = await store.take(str(key), self.rate, self.capacity, cost)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+user_rate_limiter = RateLimiter(
+    "user",
+    rate=settings.user_rate_limit,
+    capacity=settings.user_rate_burst,
+)
+upstream_rate_limiter = RateLimiter(
+    "upstream",
+    rate=settings.upstream_rate_limit,
+    capacity=settings.upstream_rate_burst,
+)
@@ -0,0 +1,189 @@
+import heapq
+import itertools
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from sqlalchemy import String, desc, func, literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Group, Subject
+
+SUBSTRING_BONUS = 0.5
+
+# Cyrillic letters that look like Latin ones, so a group typed in the wrong script still matches
+HOMOGLYPHS = str.maketrans("авекмнорстухі", "abekmhopctyxi")
+
+
+def normalize(text: str) -> str:
+    """Casefold, fold homoglyphs and drop punctuation inside words, so "КН-21" and "кн21" compare equal"""
+    words = ("".join(ch for ch in word if ch.isalnum()) for word in text.casefold().translate(HOMOGLYPHS).split())
+    return " ".join(word for word in words if word)
+
+
+def trigrams(normalized: str) -> set[str]:
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """In-memory trigram index over groups, disciplines and teachers.
+
+    Each document is indexed under one or more terms (a group by its name and
+    faculty); a document scores as its best-matching term.
+    """
+
+    def __init__(self):
+        self._ids = itertools.count()
+        # document key -> (data, entry ids)
+        self._docs: dict[tuple[str, str], tuple[dict, list[int]]] = {}
+        # entry id -> (document key, normalized term, trigram count)
+        self._entries: dict[int, tuple[tuple[str, str], str, int]] = {}
+        self._postings: defaultdict[str, set[int]] = defaultdict(set)
+
+    def add(self, kind: str, key: str, data: dict, terms: Iterable[str]) -> None:
+        doc_key = (kind, key)
+        existing = self._docs.get(doc_key)
+        if existing is not None:
+            if existing[0] == data:
+                return
+            self.remove(kind, key)
+
+        entry_ids = []
+        for term in terms:
+            normalized = normalize(term or "")
+            if not normalized:
+                continue
+            grams = trigrams(normalized)
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (doc_key, normalized, len(grams))
+            for gram in grams:
+                self._postings[gram].add(entry_id)
+            entry_ids.append(entry_id)
+        self._docs[doc_key] = (data, entry_ids)
+
+    def remove(self, kind: str, key: str) -> None:
+        doc = self._docs.pop((kind, key), None)
+        if doc is None:
+            return
+        for entry_id in doc[1]:
+            _, normalized, _ = self._entries.pop(entry_id)
+            for gram in trigrams(normalized):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(entry_id)
+                    if not postings:
+                        del self._postings[gram]
+
+    def sync_groups(self, groups: Iterable[Group]) -> None:
+        """Bring group documents in line with the given rows, touching only what changed"""
+        seen = set()
+        for group in groups:
+            seen.add(group.site_id)
+            self.add(
+                "group",
+                group.site_id,
+                {"site_id": group.site_id, "name": group.name, "faculty": group.faculty},
+                (group.name, group.faculty),
+            )
+        for kind, key in [doc_key for doc_key in self._docs if doc_key[0] == "group"]:
+            if key not in seen:
+                self.remove(kind, key)
+
+    def add_schedule(self, items: Iterable[dict]) -> None:
+        """Index discipline and teacher names seen in a fetched schedule"""
+        for item in items:
+            self.add_name("discipline", item.get("discipline"))
+            self.add_name("teacher", item.get("employee_short"))
+
+    def add_name(self, kind: str, name: str | None) -> None:
+        if not name:
+            return
+        key = normalize(name)
+        if key and (kind, key) not in self._docs:
+            self.add(kind, key, {"name": name}, (name,))
+
+    def search(self, query: str, limit: int = 10, kind: str | None = None, min_score: float = 0.2) -> list[dict]:
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        query_grams = trigrams(normalized)
+        compact_query = normalized.replace(" ", "")
+
+        hits: Counter[int] = Counter()
+        for gram in query_grams:
+            postings = self._postings.get(gram)
+            if postings:
+                hits.update(postings)
+
+        best: dict[tuple[str, str], float] = {}
+        for entry_id, shared in hits.items():
+            doc_key, normalized, gram_count = self._entries[entry_id]
+            if kind is not None and doc_key[0] != kind:
+                continue
+            score = shared / (len(query_grams) + gram_count - shared)
+            if compact_query in normalized.replace(" ", ""):
+                score += SUBSTRING_BONUS
+            if score >= min_score and score > best.get(doc_key, 0.0):
+                best[doc_key] = score
+
+        top = heapq.nlargest(limit, best.items(), key=lambda item: item[1])
+        return [
+            {"kind": doc_key[0], "score": round(score, 3), **self._docs[doc_key][0]}
+            for doc_key, score in top
+        ]
+
+
+async def load_subject_names(index: SearchIndex, session: AsyncSession) -> None:
+    """Seed disciplines and teachers from subjects persisted in the database"""
+    result = await session.execute(select(Subject.name, Subject.teacher).distinct())
+    for name, teacher in result:
+        index.add_name("discipline", name)
+        index.add_name("teacher", teacher)
+
+
+async def search_pg_trgm(session: AsyncSession, query: str, limit: int = 10, kind: str | None = None) -> list[dict]:
+    """Rank persisted groups and subjects with Postgres pg_trgm similarity"""
+    group_score = func.greatest(
+        func.similarity(Group.name, query),
+        func.coalesce(func.similarity(Group.faculty, query), 0),
+    )
+
+    def subject_names(column, kind_name):
+        return select(
+            null().label("site_id"),
+            column.label("name"),
+            null().label("faculty"),
+            func.max(func.similarity(column, query)).label("score"),
+            literal(kind_name, String).label("kind"),
+        ).where(column.op("%")(query)).group_by(column)
+
+    queries = {
+        "group": select(
+            Group.site_id.label("site_id"),
+            Group.name.label("name"),
+            Group.faculty.label("faculty"),
+            group_score.label("score"),
+            literal("group", String).label("kind"),
+        ).where(Group.name.op("%")(query) | Group.faculty.op("%")(query)),
+        "discipline": subject_names(Subject.name, "discipline"),
+        "teacher": subject_names(Subject.teacher, "teacher"),
+    }
+    selected = [stmt for name, stmt in queries.items() if kind is None or name == kind]
+    if not selected:
+        return []
+
+    combined = union_all(*selected).subquery()
+    result = await session.execute(
+        select(combined).order_by(desc(combined.c.score)).limit(limit)
+    )
+
+    results = []
+    for site_id, name, faculty, score, row_kind in result:
+        data = {"kind": row_kind, "score": round(score, 3), "name": name}
+        if row_kind == "group":
+            data.update(site_id=site_id, faculty=faculty)
+        results.append(data)
+    return results
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from src.compression import MIN_COMPRESS_SIZE, SUPPORTED_ENCODINGS, compress, dump_json, negotiate_encoding
+
+SUFFIXES = {None: ".json", "gzip": ".json.gz", "br": ".json.br"}
+
+
+class Snapshot:
+    __slots__ = ("digest", "path")
+
+    def __init__(self, digest: str, path: Path):
+        self.digest = digest
+        self.path = path
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+    def content(self) -> Any:
+        return _load_object(self.path)
+
+    def response(self, request: Request) -> Response:
+        # Whether a user gets this unfiltered body depends on their group and
+        # hidden subjects, so browsers must revalidate rather than reuse it
+        headers = {
+            "ETag": self.etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "private, no-cache",
+        }
+        if self.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        path = self.path.with_name(self.digest + SUFFIXES.get(encoding, ".json"))
+        if encoding is None or not path.exists():
+            encoding, path = None, self.path
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return FileResponse(path, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=256)
+def _load_object(path: Path) -> Any:
+    # Objects are immutable, so a path always maps to the same content
+    return json.loads(path.read_bytes())
+
+
+class SnapshotStore:
+    """Content-addressed on-disk store of per-group week schedules.
+
+    Layout, servable as-is by a static file server (gzip_static/brotli_static):
+
+        objects/<xx>/<digest>.json[.gz|.br]      immutable, named by content hash
+        groups/<site_id>/<start>_<end>.json[...] symlinks to the current object
+    """
+
+    def __init__(self, root: str | os.PathLike, ttl: int):
+        self.root = Path(root)
+        self.ttl = ttl
+
+    def _week_path(self, site_id: str, start: date, end: date) -> Path:
+        return self.root / "groups" / quote(site_id, safe="").replace(".", "%2E") / f"{start.isoformat()}_{end.isoformat()}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.json"
+
+    def get(self, site_id: str, start: date, end: date) -> Snapshot | None:
+        """Return the group's week if it was written less than `ttl` seconds ago"""
+        link = self._week_path(site_id, start, end)
+        try:
+            if time.time() - link.lstat().st_mtime > self.ttl:
+                return None
+            # Normalized so the path matches the one put() returns (shared _load_object cache key)
+            target = Path(os.path.normpath(link.parent / os.readlink(link)))
+        except OSError:
+            return None
+        return Snapshot(target.name.removesuffix(".json"), target)
+
+    def put(self, site_id: str, start: date, end: date, content: Any) -> Snapshot:
+        body = dump_json(content)
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        target = self._object_path(digest)
+
+        if not _touch_object(target):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            bodies = {None: body}
+            if len(body) >= MIN_COMPRESS_SIZE:
+                for encoding in SUPPORTED_ENCODINGS:
+                    bodies[encoding] = compress(body, encoding, cached=True)
+            # Write the identity file last: its presence marks the object complete
+            for encoding in sorted(bodies, key=lambda e: e is None):
+                _atomic_write(target.with_name(digest + SUFFIXES[encoding]), bodies[encoding])
+
+        link = self._week_path(site_id, start, end)
+        link.parent.mkdir(parents=True, exist_ok=True)
+        # Precompressed links first, identity last: a static server never pairs
+        # the new .json with a .gz/.br left over from a previous object
+        for encoding, suffix in sorted(SUFFIXES.items(), key=lambda e: e[0] is None):
+            object_file = target.with_name(digest + suffix)
+            week_file = link.with_name(link.name.removesuffix(".json") + suffix)
+            if encoding is None or object_file.exists():
+                _atomic_symlink(os.path.relpath(object_file, link.parent), week_file)
+            else:
+                week_file.unlink(missing_ok=True)
+        return Snapshot(digest, target)
+
+    def prune(self) -> None:
+        """Drop week links older than `ttl` and objects no link points to any more"""
+        cutoff = time.time() - self.ttl
+        referenced = set()
+
+        for link in self.root.glob("groups/*/*"):
+            try:
+                if link.lstat().st_mtime < cutoff:
+                    link.unlink()
+                else:
+                    referenced.add(os.path.normpath(link.parent / os.readlink(link)))
+            except OSError:
+                continue
+
+        for path in self.root.glob("objects/*/*"):
+            try:
+                if str(path) not in referenced and path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+
+def _touch_object(target: Path) -> bool:
+    """Mark an existing object as fresh so prune() keeps it; False if it does not exist"""
+    try:
+        os.utime(target)
+    except FileNotFoundError:
+        return False
+    for suffix in SUFFIXES.values():
+        try:
+            os.utime(target.with_name(target.name.removesuffix(".json") + suffix))
+        except FileNotFoundError:
+            pass
+    return True
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _atomic_symlink(target: str, path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    os.symlink(target, tmp)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,111 @@
+import json
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+# Settings are read at import time, so configure them before importing the app
+os.environ.setdefault("TOKEN", "123456:test-token")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src import database, main
+from src.auth import get_current_user
+from src.compression import ResponseCache
+from src.config import settings
+from src.events import ScheduleBroadcaster
+from src.instrumentation import count_queries
+from src.models import Group, User
+from src.ratelimit import get_rate_limit_store
+from src.search import SearchIndex
+from src.snapshots import SnapshotStore
+
+TELEGRAM_ID = 1001
+GROUP_SITE_ID = "G-1"
+
+
+def make_schedule_items(count: int = 6) -> list[dict]:
+    return [
+        {
+            "__type": "ScheduleItem",
+            "employee": "Full Teacher Name",
+            "discipline": f"Discipline {i % 3}",
+            "employee_short": "Teacher T.",
+            "study_type": "Lecture",
+            "subgroup": None,
+            "full_date": "20.10.2025",
+            "study_time": f"{8 + i}:00",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def upstream():
+    """Stub of the upstream schedule API; counts calls"""
+    state = SimpleNamespace(calls=0, items=make_schedule_items())
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state.calls += 1
+        return httpx.Response(200, text=json.dumps({"d": state.items}))
+
+    state.transport = httpx.MockTransport(handler)
+    return state
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "test.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    database.Base.metadata.create_all(sync_engine)
+    with Session(sync_engine) as session:
+        group = Group(site_id=GROUP_SITE_ID, name="КН-21", faculty="Faculty of Informatics")
+        session.add_all([group, Group(site_id="G-2", name="ІПЗ-31", faculty="Faculty of Informatics")])
+        session.flush()
+        session.add(User(telegram_id=TELEGRAM_ID, username="student", group_id=group.id))
+        session.commit()
+    sync_engine.dispose()
+
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_session_factory", None)
+    return path
+
+
+@pytest.fixture
+def client(db_path, tmp_path, upstream, monkeypatch):
+    async def no_warm_up(app):
+        pass
+
+    monkeypatch.setattr(main, "warm_up", no_warm_up)
+    monkeypatch.setattr(main, "snapshot_store", SnapshotStore(tmp_path / "snapshots", ttl=main.SCHEDULE_CACHE_TTL))
+    monkeypatch.setattr(main, "groups_cache", ResponseCache(maxsize=1, ttl=main.GROUPS_CACHE_TTL))
+    monkeypatch.setattr(main, "search_index", SearchIndex())
+    monkeypatch.setattr(main, "schedule_broadcaster", ScheduleBroadcaster(refresh_interval=main.SCHEDULE_CACHE_TTL))
+    get_rate_limit_store.cache_clear()
+
+    app = main.create_app()
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=TELEGRAM_ID, username="student")
+    with TestClient(app) as test_client:
+        app.state.http_client = httpx.AsyncClient(transport=upstream.transport)
+        yield test_client
+    get_rate_limit_store.cache_clear()
+
+
+@pytest.fixture
+def max_queries():
+    """Context manager asserting the enclosed requests issue at most `limit` SQL statements"""
+
+    @contextmanager
+    def check(limit: int):
+        with count_queries(record_statements=True) as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"expected at most {limit} queries, got {stats.count}:\n" + "\n".join(stats.statements)
+        )
+
+    return check
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from datetime import date
+
+from tests.conftest import make_schedule_items
+from src.events import ScheduleBroadcaster, diff_schedule, filter_schedule, subject_key
+from src.snapshots import SnapshotStore
+
+KEY = ("G-1", date(2025, 10, 20), date(2025, 10, 25))
+
+
+def parse(event: bytes) -> tuple[str, object]:
+    name, data = event.decode().strip().split("\n")
+    return name.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+def test_filter_schedule_drops_hidden_subjects():
+    items = make_schedule_items(6)
+    hidden = {subject_key(items[0])}
+
+    assert filter_schedule(items, set()) is items
+    filtered = filter_schedule(items, hidden)
+    assert len(filtered) == 4
+    assert all(item["discipline"] != "Discipline 0" for item in filtered)
+
+
+def test_diff_schedule_is_a_multiset_difference():
+    items = make_schedule_items(4)
+
+    assert diff_schedule(items, items) is None
+    assert diff_schedule(items, [dict(item) for item in items]) is None
+    delta = diff_schedule(items, items[1:] + [items[1]])
+    assert delta == {"added": [items[1]], "removed": [items[0]]}
+
+
+def test_stream_sends_deltas_and_cleans_up(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    items = make_schedule_items(4)
+    first = store.put(*KEY, items)
+    second = store.put(*KEY, items + [dict(items[0], study_time="18:00")])
+    broadcaster = ScheduleBroadcaster(refresh_interval=3600)
+
+    async def refresh():
+        pass
+
+    async def run():
+        stream = broadcaster.stream(KEY, 7, set(), first, refresh)
+        assert parse(await anext(stream)) == ("schedule", items)
+        poller = broadcaster._channels[KEY].poller
+
+        broadcaster.publish(KEY, second)
+        name, delta = parse(await anext(stream))
+        assert name == "delta"
+        assert delta["removed"] == [] and delta["added"][0]["study_time"] == "18:00"
+
+        broadcaster.update_hidden(7, {subject_key(items[0])})
+        name, delta = parse(await anext(stream))
+        assert name == "delta" and delta["added"] == []
+        assert {item["discipline"] for item in delta["removed"]} == {"Discipline 0"}
+
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return poller
+
+    poller = asyncio.run(run())
+    assert poller.cancelled()
+    assert not broadcaster._channels
+    assert not broadcaster._by_user
+
+
+def test_late_subscriber_does_not_revert_channel(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    items = make_schedule_items(4)
+    old = store.put(*KEY, items)
+    new = store.put(*KEY, items[:2])
+    broadcaster = ScheduleBroadcaster(refresh_interval=3600)
+
+    async def refresh():
+        pass
+
+    async def run():
+        first = broadcaster.stream(KEY, 1, set(), old, refresh)
+        await anext(first)
+        broadcaster.publish(KEY, new)
+        await anext(first)
+
+        # Read `old` before the newer snapshot landed
+        late = broadcaster.stream(KEY, 2, set(), old, refresh)
+        name, initial = parse(await anext(late))
+        assert name == "schedule" and initial == items[:2]
+        assert broadcaster._channels[KEY].snapshot.digest == new.digest
+        assert not any(sub.wakeup.is_set() for sub in broadcaster._channels[KEY].subscribers)
+
+        await first.aclose()
+        await late.aclose()
+
+    asyncio.run(run())
+    assert not broadcaster._channels
+
+
+def test_publish_diffs_once_for_all_subscribers(tmp_path, monkeypatch):
+    from src import events
+
+    store = SnapshotStore(tmp_path, ttl=300)
+    items = make_schedule_items(4)
+    first = store.put(*KEY, items)
+    second = store.put(*KEY, items[:3])
+    broadcaster = ScheduleBroadcaster(refresh_interval=3600)
+
+    calls = []
+    real_diff = events.diff_schedule
+    monkeypatch.setattr(events, "diff_schedule", lambda old, new: calls.append(1) or real_diff(old, new))
+
+    async def refresh():
+        pass
+
+    async def run():
+        streams = [broadcaster.stream(KEY, uid, set(), first, refresh) for uid in range(50)]
+        hidden_stream = broadcaster.stream(KEY, 99, {subject_key(items[1])}, first, refresh)
+        for stream in streams + [hidden_stream]:
+            await anext(stream)
+
+        broadcaster.publish(KEY, second)
+        deltas = [await anext(stream) for stream in streams]
+        hidden_delta = await anext(hidden_stream)
+
+        for stream in streams + [hidden_stream]:
+            await stream.aclose()
+        return deltas, hidden_delta
+
+    deltas, hidden_delta = asyncio.run(run())
+    assert len(set(map(id, deltas))) == 1
+    assert parse(deltas[0])[1] == {"added": [], "removed": [items[3]]}
+    assert parse(hidden_delta)[1] == {"added": [], "removed": [items[3]]}
+    assert len(calls) == 2
@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.instrumentation import count_queries, install_query_instrumentation
+
+
+def test_failed_statement_is_not_counted(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'i.db'}")
+    install_query_instrumentation(engine)
+
+    async def run():
+        async with engine.connect() as conn:
+            with count_queries() as stats:
+                with pytest.raises(Exception):
+                    await conn.execute(text("SELECT * FROM missing_table"))
+                await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats.count == 1
+    assert stats.duration > 0
@@ -0,0 +1,50 @@
+SUBJECT = {"name": "Discipline 0", "teacher": "Teacher T.", "study_type": "Lecture"}
+
+
+def test_schedule(client, max_queries):
+    with max_queries(3) as stats:
+        response = client.get("/schedule", params={"aStartDate": "20.10.2025", "aEndDate": "25.10.2025"})
+    assert response.status_code == 200
+    assert stats.count > 0
+
+
+def test_hide_subject(client, max_queries):
+    with max_queries(5):
+        response = client.post("/hide_subject", json=SUBJECT)
+    assert response.status_code == 200
+
+
+def test_unhide_subject(client, max_queries):
+    client.post("/hide_subject", json=SUBJECT)
+    with max_queries(4):
+        response = client.post("/unhide_subject", json=SUBJECT)
+    assert response.status_code == 200
+
+
+def test_get_hidden_subjects(client, max_queries):
+    client.post("/hide_subject", json=SUBJECT)
+    with max_queries(3):
+        response = client.get("/get_hidden_subjects")
+    assert response.status_code == 200
+    assert [s["discipline"] for s in response.json()] == ["Discipline 0"]
+
+
+def test_groups(client, max_queries):
+    with max_queries(1):
+        response = client.get("/groups")
+    assert response.status_code == 200
+    with max_queries(0):
+        assert client.get("/groups").status_code == 200
+
+
+def test_set_group(client, max_queries):
+    with max_queries(2):
+        response = client.post("/set-group", json={"group_id": "G-2"})
+    assert response.status_code == 200
+
+
+def test_search(client, max_queries):
+    with max_queries(1):
+        response = client.get("/search", params={"q": "кн21"})
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "КН-21"
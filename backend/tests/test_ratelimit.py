@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.ratelimit import (
+    MemoryRateLimitStore,
+    RateLimiter,
+    RateLimitStore,
+    get_rate_limit_store,
+    user_rate_limiter,
+)
+
+
+def test_store_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitStore()
+
+
+def test_bucket_allows_burst_then_asks_to_wait():
+    store = MemoryRateLimitStore()
+
+    async def run():
+        return [await store.take("user", rate=1, capacity=2) for _ in range(3)]
+
+    first, second, third = asyncio.run(run())
+    assert first == second == 0
+    assert 0 < third <= 1
+
+
+def test_buckets_are_bounded():
+    store = MemoryRateLimitStore(max_entries=3)
+
+    async def run():
+        for key in "abcde":
+            await store.take(key, rate=1, capacity=5)
+
+    asyncio.run(run())
+    assert list(store._buckets) == ["c", "d", "e"]
+
+
+def test_refilled_idle_buckets_are_evicted():
+    store = MemoryRateLimitStore()
+
+    async def run():
+        await store.take("idle", rate=1e9, capacity=1)
+        await store.take("active", rate=1, capacity=5)
+
+    asyncio.run(run())
+    assert list(store._buckets) == ["active"]
+
+
+def test_limiter_raises_429_with_retry_after():
+    limiter = RateLimiter("test-429", rate=0.5, capacity=1)
+
+    async def run():
+        await limiter.check("user")
+        await limiter.check("user")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "2"
+
+
+def test_zero_rate_disables_limiter():
+    limiter = RateLimiter("test-disabled", rate=0, capacity=20)
+
+    async def run():
+        for _ in range(100):
+            await limiter.check("user")
+
+    asyncio.run(run())
+
+
+def test_negative_rate_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter("test-negative", rate=-1, capacity=1)
+
+
+@pytest.fixture
+def fresh_stores():
+    get_rate_limit_store.cache_clear()
+    yield
+    get_rate_limit_store.cache_clear()
+
+
+def test_search_is_rate_limited_per_user(client, monkeypatch, fresh_stores):
+    monkeypatch.setattr(user_rate_limiter, "rate", 0.01)
+    monkeypatch.setattr(user_rate_limiter, "capacity", 1)
+
+    assert client.get("/search", params={"q": "кн21"}).status_code == 200
+    response = client.get("/search", params={"q": "кн21"})
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from src.search import SearchIndex, normalize
+
+
+def group(site_id, name, faculty="Faculty of Informatics"):
+    return SimpleNamespace(site_id=site_id, name=name, faculty=faculty)
+
+
+def names(results):
+    return [r["name"] for r in results]
+
+
+def test_normalize_ignores_case_punctuation_and_script():
+    assert normalize("КН-21") == normalize("кн21") == normalize("kн21")
+
+
+def test_group_search_ranks_exact_match_first():
+    index = SearchIndex()
+    index.sync_groups([group("1", "КН-21"), group("2", "КН-210"), group("3", "ІПЗ-31")])
+
+    assert names(index.search("кн21"))[:2] == ["КН-21", "КН-210"]
+    assert names(index.search("kн 21"))[0] == "КН-21"
+    assert index.search("") == []
+
+
+def test_sync_groups_updates_and_removes_incrementally():
+    index = SearchIndex()
+    index.sync_groups([group("1", "КН-21"), group("2", "ІПЗ-31")])
+    index.sync_groups([group("1", "КН-22")])
+
+    assert names(index.search("кн22")) == ["КН-22"]
+    assert index.search("іпз31") == []
+    assert index.search("кн21", min_score=0.9) == []
+
+
+def test_schedule_names_are_indexed_by_kind():
+    index = SearchIndex()
+    index.add_schedule([
+        {"discipline": "Вища математика", "employee_short": "Іваненко І.І."},
+        {"discipline": "Вища математика", "employee_short": "Петренко П.П."},
+    ])
+
+    assert names(index.search("математика")) == ["Вища математика"]
+    assert names(index.search("іваненко", kind="teacher")) == ["Іваненко І.І."]
+    assert index.search("іваненко", kind="discipline") == []
+
+
+def test_removed_documents_leave_no_postings():
+    index = SearchIndex()
+    index.sync_groups([group("1", "КН-21")])
+    index.sync_groups([])
+
+    assert not index._docs
+    assert not index._entries
+    assert not index._postings
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from tests.conftest import make_schedule_items
+from src.snapshots import SnapshotStore
+
+START, END = date(2025, 10, 20), date(2025, 10, 25)
+
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past), follow_symlinks=False)
+
+
+def test_put_then_get_returns_same_object(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    items = make_schedule_items(20)
+    snapshot = store.put("G-1", START, END, items)
+
+    found = store.get("G-1", START, END)
+    assert found.digest == snapshot.digest
+    assert found.content() == items
+    assert store.get("G-1", START, date(2025, 10, 26)) is None
+    assert sorted(p.name for p in (tmp_path / "groups" / "G-1").iterdir()) == [
+        "2025-10-20_2025-10-25.json",
+        "2025-10-20_2025-10-25.json.br",
+        "2025-10-20_2025-10-25.json.gz",
+    ]
+
+
+def test_concurrent_puts_for_same_week_do_not_collide(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    items = make_schedule_items(20)
+
+    for _ in range(10):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            snapshots = list(pool.map(lambda _: store.put("G-1", START, END, items), range(8)))
+        assert len({s.digest for s in snapshots}) == 1
+
+    assert not list(tmp_path.rglob("*.tmp"))
+    assert store.get("G-1", START, END).content() == items
+
+
+def test_prune_removes_stale_links_and_unreferenced_objects(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    old = store.put("G-1", START, END, make_schedule_items(3))
+    current = store.put("G-2", START, END, make_schedule_items(4))
+
+    for link in (tmp_path / "groups" / "G-1").iterdir():
+        age(link, 600)
+    for path in old.path.parent.glob(old.digest + "*"):
+        age(path, 600)
+
+    store.prune()
+
+    assert store.get("G-1", START, END) is None
+    assert not old.path.exists()
+    assert current.path.exists()
+    assert store.get("G-2", START, END).digest == current.digest
+
+
+def test_prune_keeps_recent_unreferenced_objects(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    snapshot = store.put("G-1", START, END, make_schedule_items(3))
+    for link in (tmp_path / "groups" / "G-1").iterdir():
+        age(link, 600)
+
+    store.prune()
+
+    assert snapshot.path.exists()
+
+
+def test_schedule_response_must_be_revalidated(client):
+    params = {"aStartDate": "20.10.2025", "aEndDate": "25.10.2025"}
+    response = client.get("/schedule", params=params)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    cached = client.get("/schedule", params=params, headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_schedule_rejects_bad_ranges(client, upstream):
+    backwards = client.get("/schedule", params={"aStartDate": "25.10.2025", "aEndDate": "20.10.2025"})
+    too_long = client.get("/schedule", params={"aStartDate": "01.09.2025", "aEndDate": "25.10.2025"})
+    assert backwards.status_code == 400
+    assert too_long.status_code == 400
+    assert upstream.calls == 0
+
+
+def test_shrunk_week_drops_stale_precompressed_links(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    store.put("G-1", START, END, make_schedule_items(20))
+    empty = store.put("G-1", START, END, [])
+
+    week_dir = tmp_path / "groups" / "G-1"
+    assert [p.name for p in week_dir.iterdir()] == ["2025-10-20_2025-10-25.json"]
+    assert store.get("G-1", START, END).digest == empty.digest
+
+
+def test_get_and_put_return_the_same_path(tmp_path):
+    store = SnapshotStore(tmp_path, ttl=300)
+    snapshot = store.put("G-1", START, END, make_schedule_items(3))
+
+    assert store.get("G-1", START, END).path == snapshot.path
+
+
+def test_concurrent_misses_share_one_upstream_fetch(client, upstream):
+    import asyncio
+
+    import httpx
+
+    from src import main
+
+    async def slow_handler(request):
+        upstream.calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=json.dumps({"d": upstream.items}))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)) as http_client:
+            return await asyncio.gather(
+                *(main.get_week_snapshot(http_client, "G-1", START, END) for _ in range(10))
+            )
+
+    snapshots = asyncio.run(run())
+    assert upstream.calls == 1
+    assert len({s.digest for s in snapshots}) == 1
+    assert not main.week_fetches